@@ -1,152 +1,362 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
+import numpy as np
+import pyarrow
 import requests
-from bs4 import BeautifulSoup
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+import lxml.html
 import datetime
+import logging
+import os
+import pathlib
 import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urljoin
 
 # --- 設定 ---
 st.set_page_config(page_title="西宮市ごみカレンダー", page_icon="🗑️")
+logger = logging.getLogger(__name__)
+
+# 同一ホストへの同時接続数（並列取得のスレッド数もこれを上限にする。
+# 超えた分の接続は使い回されずに捨てられてしまう）
+MAX_CONNECTIONS = 16
+
+# 同じホストへ何度もアクセスするので、接続を使い回すセッションを共有する
+# 一時的な通信エラーや 5xx はここで再試行し、それでも失敗したものだけを呼び出し側で扱う
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=MAX_CONNECTIONS, pool_maxsize=MAX_CONNECTIONS,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=("GET",)),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.headers.update({"User-Agent": "nishinomiya-gomi/1.0"})
+# 本文は response.raw から直接読むため、読み込み途中の切断などは urllib3 の例外のまま届く
+FETCH_ERRORS = (requests.RequestException, urllib3.exceptions.HTTPError)
+
+# 取得・解析済みのデータをプロセス再起動後も使い回すためのディスクキャッシュ
+CACHE_DIR = pathlib.Path(__file__).parent / "cache"
+CALENDAR_CACHE_TTL = datetime.timedelta(days=7)  # 月ごとのカレンダーはほぼ変わらない
+# 取得に失敗したデータは、この間は取得し直さずにエラー表示のままにする
+FETCH_RETRY_INTERVAL = datetime.timedelta(minutes=1)
 
 # ==========================================
 # 1. カレンダー取得・処理機能
 # ==========================================
+# 公式カレンダーURLのひな形（ID=466は西宮市のカレンダーID）
+_URL_TEMPLATE = "https://www.nishi.or.jp/homepage/gomicalendar/calendar_b.html?date={y}-{m:02d}&id=466#garbage-calendar"
+
+@lru_cache(maxsize=64)
 def get_url_by_date(year, month):
     """指定した年月の公式カレンダーURLを生成する"""
-    date_str = f"{year}-{month:02d}"
-    # ID=466は西宮市のカレンダーID
-    return f"https://www.nishi.or.jp/homepage/gomicalendar/calendar_b.html?date={date_str}&id=466#garbage-calendar"
+    return _URL_TEMPLATE.format(y=year, m=month)
 
-def get_weekday_str(year, month, day):
-    try:
-        dt = datetime.date(year, month, int(day))
-        weekdays = ["月", "火", "水", "木", "金", "土", "日"]
-        return weekdays[dt.weekday()]
-    except ValueError:
-        return ""
+# datetime の weekday() (月曜 = 0) に対応する曜日の文字
+WEEKDAY_CHARS = np.array(["月", "火", "水", "木", "金", "土", "日"])
+
+def fetch_calendar_month(year, month):
+    """指定した年月のカレンダーを、ディスクキャッシュがあればそこから読み込む"""
+    cache_path = CACHE_DIR / f"calendar_{year}{month:02d}.parquet"
+    age = cache_age(cache_path)
+    if age is not None and age < CALENDAR_CACHE_TTL:
+        month_df = load_cache(cache_path)
+        if month_df is not None:
+            return month_df
+
+    month_df = scrape_calendar_month(year, month)
+    if not month_df.empty:
+        # 有効期限を過ぎた月のファイル（過ぎた月の分など）は二度と使わないので消しておく
+        for old_path in CACHE_DIR.glob("calendar_*.parquet"):
+            old_age = cache_age(old_path)
+            if old_age is not None and old_age >= CALENDAR_CACHE_TTL:
+                old_path.unlink(missing_ok=True)
+        save_cache(month_df, cache_path)
+    return month_df
+
+def scrape_calendar_month(year, month):
+    """指定した年月のカレンダーページを取得し、その月の DataFrame を返す
+
+    通信に失敗した場合は FETCH_ERRORS のいずれかを送出する
+    """
+    url = get_url_by_date(year, month)
+    with _SESSION.get(url, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        tree = lxml.html.parse(response.raw, lxml.html.HTMLParser(encoding="utf-8"))
+    if tree.getroot() is None:
+        return pd.DataFrame()
+    # 最初の表のセルだけを XPath でまとめて取り出す
+    cells = pd.Series(
+        ["".join(t.strip() for t in col.itertext()) for col in tree.xpath('(//table)[1]//tr/td')],
+        dtype=object,
+    )
+    # 「日にち + ゴミの種類」をまとめて分解する
+    parts = cells.str.extract(r"^(\d+)(.*)", expand=True).dropna(subset=[0])
+    # 日にちとしてあり得ない数字（その月に存在しない日など）のセルは除外する
+    parts = parts[parts[0].str.len() <= 2]
+    dates = pd.to_datetime({"year": year, "month": month, "day": parts[0].astype("int16")}, errors="coerce")
+    parts, dates = parts[dates.notna()], dates.dropna()
+    day = parts[0].astype("int16")
+    # 列ごとの配列から一度に DataFrame を組み立てる
+    return pd.DataFrame({
+        "date_obj": dates.to_numpy(),
+        "日付": (f"{month}/" + day.astype(str)).to_numpy(),
+        "曜日": WEEKDAY_CHARS[dates.dt.weekday.to_numpy()],
+        "ゴミの種類": parts[1].to_numpy(),
+    })
 
 @st.cache_data(ttl=3600)  # 1時間キャッシュ
-def fetch_calendar_data():
-    """今月と来月のカレンダーデータをまとめて取得"""
-    now = datetime.datetime.now()
-    years_months = [(now.year, now.month)]
+def fetch_calendar_data(today):
+    """today の月と翌月のカレンダーデータをまとめて取得
+
+    今日以降の収集予定を日付順に並べた DataFrame と、
+    ゴミの種類ごとの直近の収集日（行）の辞書を返す。
+    どちらかの月の取得に失敗した場合は、一部だけのデータをキャッシュしないよう
+    FETCH_ERRORS のいずれかをそのまま送出する。
+    today は日付が変わったらキャッシュを作り直すよう、引数（キャッシュのキー）で受け取る
+    """
+    years_months = [(today.year, today.month)]
     
     # 来月の計算
-    if now.month == 12:
-        years_months.append((now.year + 1, 1))
+    if today.month == 12:
+        years_months.append((today.year + 1, 1))
     else:
-        years_months.append((now.year, now.month + 1))
+        years_months.append((today.year, today.month + 1))
     
-    all_data = []
-    
-    for year, month in years_months:
-        url = get_url_by_date(year, month)
-        try:
-            response = requests.get(url, timeout=10)
-            response.encoding = response.apparent_encoding
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                calendar_table = soup.find('table')
-                if calendar_table:
-                    rows = calendar_table.find_all('tr')
-                    for row in rows:
-                        cols = row.find_all('td')
-                        for col in cols:
-                            text = col.get_text(strip=True)
-                            if text:
-                                match = re.match(r"(\d+)(.*)", text)
-                                if match:
-                                    day_num = int(match.group(1))
-                                    gomi_type = match.group(2)
-                                    date_obj = datetime.date(year, month, day_num)
-                                    # 過去データは除外（今日以降のみ）
-                                    if date_obj >= now.date():
-                                        all_data.append({
-                                            "date_obj": date_obj,
-                                            "日付": f"{month}/{day_num}",
-                                            "曜日": get_weekday_str(year, month, day_num),
-                                            "ゴミの種類": gomi_type
-                                        })
-        except Exception:
-            pass
+    # 各月のページは並列に取得する
+    with ThreadPoolExecutor(max_workers=len(years_months)) as executor:
+        frames = [f for f in executor.map(lambda ym: fetch_calendar_month(*ym), years_months) if not f.empty]
             
-    # 日付順に並べ替え
-    df = pd.DataFrame(all_data)
+    # 過去データを除外（今日以降のみ）して日付順に並べ替え
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    next_by_type = {}
     if not df.empty:
-        df = df.sort_values('date_obj')
-    return df
+        df['date_obj'] = pd.to_datetime(df['date_obj']).astype('datetime64[ns]')
+        df = df[df['date_obj'] >= pd.Timestamp(today)].sort_values('date_obj').reset_index(drop=True)
+        # 種類は数種類しかないので、カテゴリ型にして比較・集合演算を整数コードで行う
+        df['ゴミの種類'] = df['ゴミの種類'].astype('category')
+        # 残りの列は Arrow 型にして、キャッシュの読み書きと比較を軽くする
+        df = df.convert_dtypes(dtype_backend="pyarrow")
+        # 種類ごとの直近の収集日（出現順 = 日付順）
+        next_by_type = {g: grp.iloc[0] for g, grp in df.groupby('ゴミの種類', sort=False, observed=True)}
+    return df, next_by_type
 
 # ==========================================
 # 2. 分別ガイド詳細取得機能
 # ==========================================
+# 分別ガイドのリンクのうち、取得対象とするもの
+GUIDE_KEYWORDS_RE = re.compile("もやすごみ|燃やさないごみ|資源|ペットボトル|プラ|危険")
+# ガイドの一覧ページは本文エリアだけを解析する
+GUIDE_CONTENT_STRAINER = SoupStrainer("div", id=["main", "contents"])
+
 @st.cache_data(ttl=86400) # 1日キャッシュ
 def fetch_detailed_guide():
+    """分別ガイド一覧を返す（当日分のディスクキャッシュがあれば使う）
+
+    一覧ページやサブページのどれかの取得に失敗した場合は、一部だけのデータを
+    キャッシュしないよう FETCH_ERRORS のいずれかをそのまま送出する
+    """
+    cache_path = CACHE_DIR / f"guide_{datetime.date.today():%Y%m%d}.parquet"
+    guide_df = load_cache(cache_path)
+    if guide_df is not None:
+        return guide_df.to_dict("records")
+
+    # 取得に失敗したページがあれば例外になるので、ここに来るのは全ページ取得できた場合だけ
+    guide_data = scrape_detailed_guide()
+    if guide_data:
+        for old_path in CACHE_DIR.glob("guide_*.parquet"):
+            old_path.unlink(missing_ok=True)
+        save_cache(pd.DataFrame(guide_data), cache_path)
+    return guide_data
+
+def scrape_detailed_guide():
+    """分別ガイドの各ページを取得してリストにまとめる
+
+    通信に失敗した場合は FETCH_ERRORS のいずれかを送出する
+    """
     base_url = "https://www.nishi.or.jp/kurashi/gomi/gominoshushu/gominobunnbetu.html"
     guide_data = []
+    with _SESSION.get(base_url, timeout=10, stream=True) as res:
+        res.raise_for_status()
+        res.raw.decode_content = True
+        soup = BeautifulSoup(res.raw, 'lxml', from_encoding="utf-8", parse_only=GUIDE_CONTENT_STRAINER)
+    
+    content_area = soup.find('div', id='main') or soup.find('div', id='contents')
+    if not content_area: return []
+
+    links = content_area.find_all('a')
+    # リンク文言 → URL（同じ文言のリンクは最初のものだけを使う）
+    target_urls = {}
+    for link in links:
+        href = link.get('href')
+        text = link.get_text(strip=True)
+        if href and text and text not in target_urls and GUIDE_KEYWORDS_RE.search(text):
+            target_urls[text] = urljoin(base_url, href)
+
+    # サブページは並列に取得する（取得順は target_urls の順に揃える）
+    if target_urls:
+        with ThreadPoolExecutor(max_workers=min(len(target_urls), MAX_CONNECTIONS)) as executor:
+            for item in executor.map(lambda t: fetch_guide_page(*t), target_urls.items()):
+                if item:
+                    guide_data.append(item)
+    return guide_data
+
+def fetch_guide_page(title, link_url):
+    """分別ガイドのサブページを1件取得して辞書にまとめる
+
+    通信に失敗した場合は FETCH_ERRORS のいずれかを送出する
+    """
+    with _SESSION.get(link_url, timeout=5, stream=True) as sub_res:
+        sub_res.raise_for_status()
+        sub_res.raw.decode_content = True
+        sub_tree = lxml.html.parse(sub_res.raw, lxml.html.HTMLParser(encoding="utf-8"))
+    if sub_tree.getroot() is None:
+        return None
+    sub_content = sub_tree.xpath('//div[@id="main"]') or sub_tree.xpath('//div[@id="contents"]')
+    if sub_content:
+        sub_content = sub_content[0]
+        for script in sub_content.xpath('.//script|.//style'):
+            script.drop_tree()
+        # テキストを一度だけ連結し、連続する空白は1つにまとめる
+        details_text = " ".join(word for text in sub_content.itertext() for word in text.split())
+        mapped_category = map_guide_to_calendar(title)
+        return {
+            "category_name": title,
+            "calendar_name": mapped_category,
+            "details": details_text,
+            "url": link_url
+        }
+    return None
+
+def cache_age(cache_path):
+    """ディスクキャッシュのファイルが書かれてからの経過時間（無ければ None）"""
+    try:
+        modified = datetime.datetime.fromtimestamp(cache_path.stat().st_mtime)
+    except OSError:
+        return None
+    return datetime.datetime.now() - modified
+
+def load_cache(cache_path):
+    """ディスクキャッシュを読み込む（無い・壊れている場合は None を返す）"""
     try:
-        res = requests.get(base_url, timeout=10)
-        res.encoding = res.apparent_encoding
-        soup = BeautifulSoup(res.text, 'html.parser')
-        
-        content_area = soup.find('div', id='main') or soup.find('div', id='contents')
-        if not content_area: return []
-
-        links = content_area.find_all('a')
-        target_urls = []
-        for link in links:
-            href = link.get('href')
-            text = link.get_text(strip=True)
-            if href and text:
-                keywords = ["もやすごみ", "燃やさないごみ", "資源", "ペットボトル", "プラ", "危険"]
-                if any(k in text for k in keywords):
-                    full_url = urljoin(base_url, href)
-                    target_urls.append((text, full_url))
-        
-        target_urls = list(set(target_urls))
-
-        for title, link_url in target_urls:
-            try:
-                sub_res = requests.get(link_url, timeout=5)
-                sub_res.encoding = sub_res.apparent_encoding
-                sub_soup = BeautifulSoup(sub_res.text, 'html.parser')
-                sub_content = sub_soup.find('div', id='main') or sub_soup.find('div', id='contents')
-                if sub_content:
-                    for script in sub_content(["script", "style"]):
-                        script.decompose()
-                    details_text = sub_content.get_text("\n", strip=True)
-                    mapped_category = map_guide_to_calendar(title)
-                    guide_data.append({
-                        "category_name": title,
-                        "calendar_name": mapped_category,
-                        "details": details_text,
-                        "url": link_url
-                    })
-            except Exception:
-                continue
-        return guide_data
-    except Exception:
-        return []
+        return pd.read_parquet(cache_path)
+    except FileNotFoundError:
+        return None
+    except (OSError, pyarrow.ArrowException) as e:
+        # 書き込み途中で止まったファイルなどは削除して、取得し直してもらう
+        logger.warning("broken cache %s: %s", cache_path, e)
+        cache_path.unlink(missing_ok=True)
+        return None
 
+def save_cache(df, cache_path):
+    """DataFrame をディスクキャッシュに書き出す（書き込めない環境では何もしない）"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # 読み込み側が書きかけのファイルを見ないよう、一時ファイルに書いてから置き換える
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix=".tmp", delete=False) as f:
+            tmp_path = pathlib.Path(f.name)
+        try:
+            df.to_parquet(tmp_path, compression="zstd")
+            os.replace(tmp_path, cache_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+# ガイドのカテゴリ名に含まれる語 → カレンダー上のゴミの種類
+_GUIDE_MAP = {
+    "もやすごみ": "燃やすごみ", "燃やさないごみ": "燃やさないごみ",
+    "資源A": "資源A", "資源B": "資源B",
+    "その他プラ": "その他プラ", "ペットボトル": "ペットボトル",
+}
+
+@lru_cache(maxsize=256)
 def map_guide_to_calendar(guide_title):
-    mapping = {
-        "もやすごみ": "燃やすごみ", "燃やさないごみ": "燃やさないごみ",
-        "資源A": "資源A", "資源B": "資源B",
-        "その他プラ": "その他プラ", "ペットボトル": "ペットボトル",
-    }
-    for key, val in mapping.items():
+    for key, val in _GUIDE_MAP.items():
         if key in guide_title: return val
     return guide_title
 
+# cache_data だと再実行のたびにインデックス全体を複製してしまうため、
+# ガイドの内容をキーに同じオブジェクトを使い回す（呼び出し側では変更しないこと）
+@st.cache_resource(max_entries=2)
+def build_search_index(guide_data):
+    """2文字ずつ区切った文字列 → ガイド番号の集合 の転置インデックスを作る"""
+    index = {}
+    for i, item in enumerate(guide_data):
+        for text in (item['details'], item['category_name']):
+            for j in range(len(text) - 1):
+                index.setdefault(text[j:j + 2], set()).add(i)
+    return index
+
+def search_guide(guide_list, index, query):
+    """キーワードを含むガイドを元の並び順で返す"""
+    if len(query) >= 2:
+        # 候補をインデックスで絞り込んでから、本文に含まれるかを確認する
+        candidates = set.intersection(*[index.get(query[k:k + 2], set()) for k in range(len(query) - 1)])
+        items = [guide_list[i] for i in sorted(candidates)]
+    else:
+        items = guide_list
+    return [item for item in items if query in item['details'] or query in item['category_name']]
+
 # ==========================================
 # 3. メイン表示処理
 # ==========================================
+def run_with_script_ctx(ctx, func, *args):
+    """ワーカースレッドにスクリプトの実行コンテキストを渡してから func を呼ぶ"""
+    thread = threading.current_thread()
+    attrs_before = set(vars(thread))
+    add_script_run_ctx(thread, ctx)
+    try:
+        return func(*args)
+    finally:
+        # 終わったらコンテキストを外し、スレッドにセッションの参照を残さない
+        for name in set(vars(thread)) - attrs_before:
+            delattr(thread, name)
+
 def main():
     st.title("🗑️ 西宮市 ごみ収集ナビ")
+    today = datetime.date.today()
+    today_ts = pd.Timestamp(today)  # カレンダーの date_obj 列との比較用
+
+    # 失敗はキャッシュされないので、直前に失敗したものは入力のたびに再試行せず
+    # FETCH_RETRY_INTERVAL の間はそのままエラー表示にする
+    failed_at = st.session_state.setdefault("fetch_failed_at", {})
+    now = datetime.datetime.now()
+    loaders = {
+        name: (func, args)
+        for name, func, args in [("calendar", fetch_calendar_data, (today,)), ("guide", fetch_detailed_guide, ())]
+        if name not in failed_at or now - failed_at[name] >= FETCH_RETRY_INTERVAL
+    }
+    results = {}
+    if loaders:
+        with st.spinner('データを更新しています...'):
+            # カレンダーと分別ガイドは同時に取得する（プールはこの実行の間だけ使う）
+            ctx = get_script_run_ctx()
+            with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+                futures = {
+                    name: executor.submit(run_with_script_ctx, ctx, func, *args)
+                    for name, (func, args) in loaders.items()
+                }
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                    failed_at.pop(name, None)
+                except FETCH_ERRORS as e:
+                    logger.warning("fetch failed: %s", e)
+                    failed_at[name] = now
 
-    with st.spinner('データを更新しています...'):
-        df_calendar = fetch_calendar_data()
-        guide_list = fetch_detailed_guide()
+    # 取得できなかった場合はそれぞれのタブでエラー表示にする
+    df_calendar, next_by_type = results.get("calendar", (pd.DataFrame(), {}))
+    guide_failed = "guide" not in results
+    guide_list = results.get("guide", [])
+    guide_index = build_search_index(guide_list)
 
     tab1, tab2 = st.tabs(["📅 カレンダー", "🔍 分別・検索"])
 
@@ -155,19 +365,16 @@ def main():
     # -----------------------
     with tab1:
         # 公式サイトへのリンク
-        now = datetime.datetime.now()
-        current_month_url = get_url_by_date(now.year, now.month)
-        st.markdown(f"**公式サイトで確認:** [👉 西宮市ごみカレンダー ({now.month}月分)]({current_month_url})")
+        current_month_url = get_url_by_date(today.year, today.month)
+        st.markdown(f"**公式サイトで確認:** [👉 西宮市ごみカレンダー ({today.month}月分)]({current_month_url})")
 
         if df_calendar is not None and not df_calendar.empty:
-            today_date = now.date()
-            
-            # 今日以降のデータだけを使う
-            future_df = df_calendar[df_calendar['date_obj'] >= today_date]
+            # 今日以降のデータだけを使う（日付順に並んでいるので二分探索で切り出す）
+            future_df = df_calendar.iloc[df_calendar['date_obj'].searchsorted(today_ts):]
 
             if not future_df.empty:
                 # === 今日の収集 ===
-                today_df = future_df[future_df['date_obj'] == today_date]
+                today_df = future_df[future_df['date_obj'] == today_ts]
                 if not today_df.empty:
                     row = today_df.iloc[0]
                     st.markdown("### 📅 今日の収集")
@@ -191,23 +398,16 @@ def main():
                 st.subheader("👀 次回以降の予定 (1週間以内にないもの)")
                 
                 types_in_week = set(one_week_df['ゴミの種類'].unique())
-                types_in_rest = set(rest_df['ゴミの種類'].unique())
+                # 種類ごとの最短の日付を1回の groupby でまとめて求める（日付順なので first が最短）
+                rest_first = rest_df.groupby('ゴミの種類', sort=False, observed=True).first()
                 
                 # 「未来にはある」けど「直近1週間にはない」ゴミ
-                missing_types = types_in_rest - types_in_week
+                missing_types = [g_type for g_type in rest_first.index if g_type not in types_in_week]
                 
                 if missing_types:
-                    found_count = 0
                     for g_type in missing_types:
-                        # そのゴミの最短の日付を探す
-                        next_match = rest_df[rest_df['ゴミの種類'] == g_type]
-                        if not next_match.empty:
-                            next_row = next_match.iloc[0]
-                            st.info(f"**{g_type}** は、少し先の **{next_row['日付']} ({next_row['曜日']})** です")
-                            found_count += 1
-                    
-                    if found_count == 0:
-                         st.caption("※これ以外の収集予定は今のところありません。")
+                        next_row = rest_first.loc[g_type]
+                        st.info(f"**{g_type}** は、少し先の **{next_row['日付']} ({next_row['曜日']})** です")
                 else:
                     st.caption("※主要なゴミはすべて1週間以内に収集があります。")
 
@@ -223,34 +423,32 @@ def main():
     # -----------------------
     with tab2:
         st.header("🔍 ごみ分別検索")
+        if guide_failed:
+            st.error("分別ガイドが取得できませんでした。時間をおいて再度お試しください。")
         query = st.text_input("検索キーワード (例: 電池, フライパン)", "")
 
         if query:
             found_count = 0
-            for item in guide_list:
-                if query in item['details'] or query in item['category_name']:
-                    found_count += 1
-                    cat_name = item['category_name']
-                    cal_name = item['calendar_name']
+            for item in search_guide(guide_list, guide_index, query):
+                found_count += 1
+                cat_name = item['category_name']
+                cal_name = item['calendar_name']
+                
+                with st.container():
+                    st.markdown(f"### 💡 {cat_name} の可能性があります")
+                    
+                    # 種類ごとの直近の収集日から探す（辞書は日付順なので最初の一致が最短）
+                    next_pickup = next(
+                        (row for g_type, row in next_by_type.items() if cal_name in g_type), None
+                    )
+                    if next_pickup is not None:
+                        st.success(f"**次の収集日:** 📅 **{next_pickup['日付']} ({next_pickup['曜日']})**")
                     
-                    with st.container():
-                        st.markdown(f"### 💡 {cat_name} の可能性があります")
-                        
-                        if df_calendar is not None and not df_calendar.empty:
-                            # 今日以降のカレンダーから探す
-                            matches = df_calendar[
-                                (df_calendar['ゴミの種類'].str.contains(cal_name, na=False)) &
-                                (df_calendar['date_obj'] >= datetime.datetime.now().date())
-                            ]
-                            if not matches.empty:
-                                next_pickup = matches.iloc[0]
-                                st.success(f"**次の収集日:** 📅 **{next_pickup['日付']} ({next_pickup['曜日']})**")
-                        
-                        with st.expander("詳しい出し方を見る"):
-                            st.markdown(f"[公式ページで見る]({item['url']})")
-                            preview = item['details'][:300] + "..." if len(item['details']) > 300 else item['details']
-                            st.text(preview)
-                        st.divider()
+                    with st.expander("詳しい出し方を見る"):
+                        st.markdown(f"[公式ページで見る]({item['url']})")
+                        preview = item['details'][:300] + "..." if len(item['details']) > 300 else item['details']
+                        st.text(preview)
+                    st.divider()
             if found_count == 0:
                 st.warning(f"「{query}」は見つかりませんでした。")
         else:
@@ -0,0 +1,105 @@
+import datetime
+import io
+import os
+
+import pandas as pd
+import pytest
+import urllib3
+
+import app
+
+INDEX_HTML = """<html><body><div id="main">
+<a href="/x/moyasu.html">もやすごみ</a>
+<a href="/x/shigen.html">資源A</a>
+</div></body></html>"""
+
+SUB_HTML = """<html><body><div id="main"><p>電池 は {name} です。</p></div></body></html>"""
+
+
+class FakeResponse:
+    """_SESSION.get(..., stream=True) の戻り値の代わり"""
+
+    def __init__(self, body, error=None):
+        self.raw = io.BytesIO(body.encode("utf-8"))
+        self.error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.error:
+            raise self.error
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "CACHE_DIR", tmp_path)
+    app.fetch_detailed_guide.clear()
+    yield tmp_path
+    app.fetch_detailed_guide.clear()
+
+
+def fake_get(failing_url_part=None, index_error=None):
+    def get(url, **kwargs):
+        if "gominobunnbetu" in url:
+            return FakeResponse(INDEX_HTML, error=index_error)
+        if failing_url_part and failing_url_part in url:
+            # 本文の読み込み途中で切断された場合と同じ例外
+            raise urllib3.exceptions.ProtocolError("Connection broken")
+        return FakeResponse(SUB_HTML.format(name=url.rsplit("/", 1)[1]))
+    return get
+
+
+def test_complete_guide_is_persisted(cache_dir, monkeypatch):
+    monkeypatch.setattr(app._SESSION, "get", fake_get())
+
+    guide_data = app.fetch_detailed_guide()
+
+    assert [item["category_name"] for item in guide_data] == ["もやすごみ", "資源A"]
+    cached = list(cache_dir.glob("guide_*.parquet"))
+    assert len(cached) == 1
+    assert app.load_cache(cached[0]).to_dict("records") == guide_data
+
+
+def test_partial_guide_is_not_persisted(cache_dir, monkeypatch):
+    monkeypatch.setattr(app._SESSION, "get", fake_get(failing_url_part="moyasu"))
+
+    with pytest.raises(app.FETCH_ERRORS):
+        app.fetch_detailed_guide()
+
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_index_failure_is_not_persisted(cache_dir, monkeypatch):
+    error = app.requests.HTTPError("503 Server Error")
+    monkeypatch.setattr(app._SESSION, "get", fake_get(index_error=error))
+
+    with pytest.raises(app.FETCH_ERRORS):
+        app.fetch_detailed_guide()
+
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_broken_cache_is_treated_as_a_miss(tmp_path):
+    cache_path = tmp_path / "guide_20261015.parquet"
+    cache_path.write_bytes(b"PAR1 truncated")
+
+    assert app.load_cache(cache_path) is None
+    assert not cache_path.exists()
+
+
+def test_expired_calendar_months_are_pruned(cache_dir, monkeypatch):
+    month_df = pd.DataFrame({"date_obj": [pd.Timestamp("2026-10-01")], "日付": ["10/1"],
+                             "曜日": ["木"], "ゴミの種類": ["燃やすごみ"]})
+    monkeypatch.setattr(app, "scrape_calendar_month", lambda year, month: month_df)
+    expired = cache_dir / "calendar_202609.parquet"
+    app.save_cache(month_df, expired)
+    old = (datetime.datetime.now() - app.CALENDAR_CACHE_TTL).timestamp() - 60
+    os.utime(expired, (old, old))
+
+    app.fetch_calendar_month(2026, 10)
+
+    assert sorted(p.name for p in cache_dir.iterdir()) == ["calendar_202610.parquet"]